@@ -25,7 +25,7 @@ simulates 21 consecutive days per participant and includes variables such as:
 
 These enhancements are designed for integration into the 'prepostpleep_studypipeline' project (under development).
 
-The output is saved as Excel (.xlsx).
+The main output is saved as Parquet (.parquet; .csv and .xlsx are also supported), the JSON block version as Excel (.xlsx).
 
 Author: Iris Vantieghem  
 Created: July 2025  
@@ -37,67 +37,97 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, time, timedelta
 from pathlib import Path
+import importlib.util
 import json
 
+try:
+    import orjson  # optional: Rust-backed JSON serializer, considerably faster than the json module
+except ImportError:
+    orjson = None
+
 base_path = Path(__file__).resolve().parent
 
+# Prefer xlsxwriter for writing .xlsx output (considerably faster than openpyxl); fall back to openpyxl if unavailable
+EXCEL_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+
+# Save a DataFrame in the format given by the file suffix: .parquet, .csv, or .xlsx (default)
+def save_table(df, output_path):
+    suffix = Path(output_path).suffix.lower()
+    if suffix == ".parquet":
+        df.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False)
+    elif suffix == ".csv":
+        df.to_csv(output_path, index=False)
+    else:
+        df.to_excel(output_path, index=False, engine=EXCEL_ENGINE)
+
+
+# Serialize to a compact JSON string; uses orjson if installed, else the json module with matching output
+def dumps_json(obj):
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
 
-def generate_time_series_sleepdata(parameter_path, output_path, days=21, n_participants=300, seed=42):
-    
-    """
-    Generates synthetic time series sleep diary data based on Natale et al. (2009), with additional habit-related variables.
-    
-    Each mock participant is assigned a unique ID and email, and 21 consecutive days of diary entries are simulated.
-    Core sleep variables (e.g., SOL, WASO, TST, SE) are based on group-level statistics from Natale et al. (2009).
-    Supplementary variables (e.g., Caffeine, Rested, Medication) are added using plausible distributions.
-    
-    Gamma distributions model positively skewed variables (e.g., SOL, WASO), while clock-time 
-    variables are drawn from normal distributions centered around realistic values.
-    
-    In addition to the main numeric dataset, the function also creates an alternate version containing
-    a JSON-formatted sleep block per entry.
-    
-    Parameters:
-    - parameter_path (str or Path): Excel file containing group-level sleep parameters.
-    - output_path (str or Path): Path to save the primary .xlsx file with numeric and clock-format variables.
-    - days (int, default=21): Number of simulated days per participant.
-    - n_participants (int, default=300): Number of mock participants to generate.
-    - seed (int, default=42): Seed value for reproducibility.
-    
-    Returns:
-    - df (pd.DataFrame): The main DataFrame with numeric and clock-format variables.
-      An additional Excel file is saved alongside the main output, including an extra column ('Sleep_JSON')
-      with sleep details in JSON-like format.
-    """
 
-    np.random.seed(seed)
+# Format minutes relative to midnight (negative or beyond 24h allowed) as "HH:MM" clock times
+def minutes_to_clock(values):
+    hours, minutes = np.divmod(np.floor(values).astype(int) % (24 * 60), 60)
+    return [f"{h:02d}:{m:02d}" for h, m in zip(hours.tolist(), minutes.tolist())]
 
-    df_params = pd.read_excel(parameter_path).set_index("Variable")
+
+# Derive the remaining sleep parameters from the drawn clock times, SOL, WASO, and wait time (all arrays, in minutes)
+def derive_sleep_measures(lights_off_min, sleep_end_min, sol, waso, wait_time):
+    # Getting out of bed happens 'wait_time' minutes after waking up
+    out_of_bed_min = sleep_end_min + wait_time
+
+    # Time in bed
+    tib = out_of_bed_min - lights_off_min # Out of bed includes time between waking up & getting up
+
+    # TWT
+    twt = sol + waso
+
+    # Total Sleep Time
+    tst = tib - (sol + waso)
+
+    # Sleep efficiency
+    se = np.where(tib > 0, (tst / tib) * 100, np.nan)
+
+    # Midpoint of sleep based on lights_off and time of getting out of bed
+    midpoint = (lights_off_min + out_of_bed_min) / 2 # Alternatively, (lights_off_min + sol) + out_of_bed_min
+
+    return out_of_bed_min, tib, twt, tst, se, midpoint
+
+
+# Load group-level parameters and return them as {variable: (mean, SD)} with clock times and their SDs in minutes
+def load_sleep_parameters(parameter_path):
+    # .csv parameter files are read without the Excel (openpyxl) stack; other files are read as Excel.
+    # 'Mean' mixes clock times and numbers, so it is kept as a generic object column (as read_excel does)
+    if Path(parameter_path).suffix.lower() == ".csv":
+        df_params = pd.read_csv(parameter_path, dtype={"Mean": object}).set_index("Variable")
+    else:
+        df_params = pd.read_excel(parameter_path).set_index("Variable")
 
         
     # Convert various time formats to minutes past midnight. Allows negative values for evening times if specified.
     def convert_time_to_minutes(val, allow_negative=False):
-        if isinstance(val, (pd.Timestamp, datetime)):
-            mins = val.hour * 60 + val.minute
-
-        elif isinstance(val, time):
-            mins = val.hour * 60 + val.minute
-
-        elif isinstance(val, timedelta):
-            return val.total_seconds() / 60
+        # Plain numbers are already in minutes: return early
+        if isinstance(val, (int, float)):
+            return val
 
         elif isinstance(val, str):
             t = pd.to_datetime(val).time()
             mins = t.hour * 60 + t.minute
 
-        elif isinstance(val, (int, float)):
-            return val
+        elif isinstance(val, (pd.Timestamp, datetime, time)):
+            mins = val.hour * 60 + val.minute
+
+        elif isinstance(val, timedelta):
+            return val.total_seconds() / 60
         
         else:
             raise TypeError(f"Unexpected type: {type(val)}")
         
         if allow_negative and mins >= 1080: # 18*60 meaning after 6 pm! --> if after 6 pm: interpret this as 'the evening before'
-            print("conversion going on: ", mins - 1440)
             return mins - 1440  # interpretes 23:30 as -30
         return mins
     
@@ -110,158 +140,237 @@ def generate_time_series_sleepdata(parameter_path, output_path, days=21, n_parti
     df_params.loc["Light Off", "SD"] *= 60
     df_params.loc["Sleep End", "SD"] *= 60
 
-    # Retrieve mean and SD for a given variable from the parameter table
-    def get_params(var):
-        return float(df_params.loc[var, "Mean"]), float(df_params.loc[var, "SD"])
+    # Mean and SD per variable as a plain dict, so lookups skip pandas label-based indexing
+    return {var: (float(df_params.loc[var, "Mean"]), float(df_params.loc[var, "SD"])) for var in df_params.index}
 
-    records = []
-    
+
+# Build the identifier columns (participant code, email, date), which are the same for every group
+def build_identifier_columns(n_participants, days):
     # Startdate for simulation (added for advanced generator)
     start_date = pd.to_datetime("2024-03-01")
-
-
-    for pid in range(1, n_participants + 1):
-        for day in range(1, days + 1):
-            #record = {"Code": f"Mock_{pid:03d}", "Day": day}
-            record = {
-                "Participant": f"Mock_{pid:03d}",
-                "Email": f"mock_{pid:03d}@example.test", # added for advanced generator
-                "Day": (start_date + pd.Timedelta(days=day - 1)).strftime("%d/%m/%Y")
-            }
-
-            
-            # Generated sleep parameters:         
-            
-            # Lights off (based on mean, SD from Natale et al., 2009)    
-            mu_loff, sd_loff = get_params("Light Off")
-            lights_off_min = np.random.normal(mu_loff, sd_loff)
-            record["Lights_Off"] = lights_off_min
-            
-            # Sleep End (based on mean, SD from Natale et al., 2009) 
-            mu_send, sd_send = get_params("Sleep End")
-            sleep_end_min = np.random.normal(mu_send, sd_send)
-            record["Sleep_End"] = sleep_end_min
-            
-            # Sleep Onset Latency (based on mean, SD from Natale et al., 2009) 
-            mu_sol, sd_sol = get_params("SOL")
-            shape_sol = (mu_sol / sd_sol) ** 2
-            scale_sol = sd_sol ** 2 / mu_sol
-            sol = np.random.gamma(shape_sol, scale_sol)
-            record["SOL"] = sol
-            
-            # Wake After Sleep Onset (based on mean, SD from Natale et al., 2009)
-            mu_waso, sd_waso = get_params("WASO")
-            shape_waso = (mu_waso / sd_waso) ** 2
-            scale_waso = sd_waso ** 2 / mu_waso
-            waso = np.random.gamma(shape_waso, scale_waso)
-            record["WASO"] = waso
-            
-            # Derived sleep parameters:
-            
-            # Time between waking up and getting out of bed
-            wait_time = np.clip(np.random.normal(15, 10), 5, 30)
-            out_of_bed_min = sleep_end_min + wait_time
-            record["Out_of_Bed"] = out_of_bed_min
-            
-            # Time in bed
-            tib = out_of_bed_min - lights_off_min # Out of bed includes time between waking up & getting up
-            record["TIB"] = tib
-            
-            # TWT
-            twt = sol + waso
-            record["TWT"] = twt
-            
-            # Total Sleep Time
-            tst = tib - (sol + waso)
-            record["TST"] = tst
-                     
-            # Sleep efficiency
-            se = (tst / tib) * 100 if tib > 0 else np.nan
-            record["SE"] = se
-            
-            # Midpoint of sleep based on lights_off and time of getting out of bed
-            midpoint = (lights_off_min + out_of_bed_min) / 2 # Alternatively, (lights_off_min + sol) + out_of_bed_min
-            record["Midpoint"] = midpoint
-            
-            # Simulated subjective and habit-related diary variables
-
-            # Subjective Sleep Quality (1–10 scale)
-            record["SQ"] = int(np.clip(np.round(np.random.normal(7, 1.5)), 1, 10))
-            
-            # Feeling Rested (1–10 scale)
-            record["Rested"] = int(np.clip(np.round(np.random.normal(6.5, 1.8)), 1, 10))
-            
-            # Physical Activity (minutes/day)
-            record["Physical_Activity_Minutes"] = int(np.clip(np.random.normal(50, 20), 0, 180))
-            
-            # Caffeine intake (cups per day)
-            record["Caffeine"] = int(np.clip(np.random.poisson(1.2), 0, 6))
-            
-            # Medication (set to None)
-            record["Medication"] = None
-            
-            # Time to calm down and relax before bed (in minutes)
-            record["time to calm down and relax"] = int(np.clip(np.random.normal(45, 15), 0, 120))
-
-            #######
-            
-            records.append(record)
-
-    df = pd.DataFrame(records)
+    # Date strings only depend on the day, so they are formatted once and tiled over all participants
+    day_strings = [(start_date + pd.Timedelta(days=d)).strftime("%d/%m/%Y") for d in range(days)]
+
+    # Participant codes and emails are formatted once per participant and repeated for each day
+    codes = [f"Mock_{pid:03d}" for pid in range(1, n_participants + 1)]
+    emails = [f"mock_{pid:03d}@example.test" for pid in range(1, n_participants + 1)] # added for advanced generator
+
+    return {
+        "Participant": np.repeat(codes, days),
+        "Email": np.repeat(emails, days),
+        "Day": np.tile(day_strings, n_participants),
+    }
+
+
+# Simulate the sleep and diary variables of one group and combine them with the identifier columns into one DataFrame
+def build_sleepdata(params, identifiers, rng):
+    # All entries are drawn in one batch: one row per participant per day
+    n_records = len(identifiers["Participant"])
+
+    # All normally distributed variables share one standard normal draw; each row is scaled to its own mean and SD
+    z_loff, z_send, z_wait, z_sq, z_rested, z_activity, z_calm = rng.standard_normal((7, n_records))
+
+    # Generated sleep parameters:
+
+    # Lights off (based on mean, SD from Natale et al., 2009)
+    mu_loff, sd_loff = params["Light Off"]
+    lights_off_min = mu_loff + sd_loff * z_loff
+
+    # Sleep End (based on mean, SD from Natale et al., 2009)
+    mu_send, sd_send = params["Sleep End"]
+    sleep_end_min = mu_send + sd_send * z_send
+
+    # Sleep Onset Latency (based on mean, SD from Natale et al., 2009)
+    mu_sol, sd_sol = params["SOL"]
+    shape_sol = (mu_sol / sd_sol) ** 2
+    scale_sol = sd_sol ** 2 / mu_sol
+    sol = rng.gamma(shape_sol, scale_sol, n_records)
+
+    # Wake After Sleep Onset (based on mean, SD from Natale et al., 2009)
+    mu_waso, sd_waso = params["WASO"]
+    shape_waso = (mu_waso / sd_waso) ** 2
+    scale_waso = sd_waso ** 2 / mu_waso
+    waso = rng.gamma(shape_waso, scale_waso, n_records)
+
+    # Derived sleep parameters:
+
+    # Time between waking up and getting out of bed
+    wait_time = np.clip(15 + 10 * z_wait, 5, 30)
+
+    out_of_bed_min, tib, twt, tst, se, midpoint = derive_sleep_measures(lights_off_min, sleep_end_min, sol, waso, wait_time)
+
+    # Simulated subjective and habit-related diary variables (small integer dtypes suffice for these ranges)
+
+    # Subjective Sleep Quality (1–10 scale)
+    sq = np.clip(np.rint(7 + 1.5 * z_sq), 1, 10).astype(np.int8)
+
+    # Feeling Rested (1–10 scale)
+    rested = np.clip(np.rint(6.5 + 1.8 * z_rested), 1, 10).astype(np.int8)
+
+    # Physical Activity (minutes/day)
+    physical_activity = np.clip(50 + 20 * z_activity, 0, 180).astype(np.int16)
+
+    # Caffeine intake (cups per day)
+    caffeine = np.clip(rng.poisson(1.2, n_records), 0, 6).astype(np.int8)
+
+    # Time to calm down and relax before bed (in minutes)
+    calm_down = np.clip(45 + 15 * z_calm, 0, 120).astype(np.int8)
+
+    # Columns are assembled as arrays (no per-row dicts); copy=False lets pandas wrap them without copying.
+    # Sleep variables are stored as float32: minute-level values do not need double precision
+    df = pd.DataFrame({
+        "Participant": identifiers["Participant"],
+        "Email": identifiers["Email"],
+        "Day": identifiers["Day"],
+        "Lights_Off": lights_off_min.astype(np.float32),
+        "Sleep_End": sleep_end_min.astype(np.float32),
+        "SOL": sol.astype(np.float32),
+        "WASO": waso.astype(np.float32),
+        "Out_of_Bed": out_of_bed_min.astype(np.float32),
+        "TIB": tib.astype(np.float32),
+        "TWT": twt.astype(np.float32),
+        "TST": tst.astype(np.float32),
+        "SE": se.astype(np.float32),
+        "Midpoint": midpoint.astype(np.float32),
+        "SQ": sq,
+        "Rested": rested,
+        "Physical_Activity_Minutes": physical_activity,
+        "Caffeine": caffeine,
+        "Medication": None, # Medication (set to None, broadcast to all rows)
+        "time to calm down and relax": calm_down,
+    }, copy=False)
 
     # Add clock-format columns 
     for col in ["Lights_Off", "Sleep_End", "Midpoint"]:
-        df[f"{col}_Clock"] = df[col].apply(lambda x: pd.to_datetime(x % (24 * 60), unit='m').strftime("%H:%M"))
-    
+        df[f"{col}_Clock"] = minutes_to_clock(df[col].to_numpy())
 
-    # Build JSON-like column to include sleep variables to create a more realistic excel output (e.g. export from a website) 
-    def build_sleep_json(row):
-        start_time = pd.to_datetime(row["Lights_Off"] % (24*60), unit='m').strftime("%H:%M")
-        end_time = pd.to_datetime(row["Sleep_End"] % (24*60), unit='m').strftime("%H:%M")
-        # sleep_in = int(round(row["SOL"]))
-    
-        json_data = {
+    return df
+
+
+# Build JSON-like column to include sleep variables to create a more realistic excel output (e.g. export from a website) 
+def build_sleep_json(df):
+    # start/end match the clock columns; totals are rounded column-wise before serializing
+    sl = np.rint(df["SOL"].to_numpy()).astype(int).tolist()
+    wans = np.rint(df["WASO"].to_numpy()).astype(int).tolist()
+    twt = np.rint(df["SOL"].to_numpy() + df["WASO"].to_numpy()).astype(int).tolist()
+    tib = np.rint(df["TIB"].to_numpy()).astype(int).tolist()
+    tst = np.rint(df["TST"].to_numpy()).astype(int).tolist()
+    se = np.round(df["SE"].to_numpy(np.float64), 1) # rounded in float64 so e.g. 87.8 is not serialized as 87.80000305
+    se = np.where(np.isnan(se), None, se).tolist() # missing SE becomes null with either serializer
+
+    return [
+        dumps_json({
             "start": start_time,
             "end": end_time,
             #"values": [],  # optional: include other time series into values
-            "totals": {
-                "sl": int(round(row["SOL"])),
-                "wans": int(round(row["WASO"])),
-                "twt": int(round(row["SOL"] + row["WASO"])),
-                "tib": int(round(row["TIB"])),
-                "tst": int(round(row["TST"])),
-                "se": round(row["SE"], 1)
-            }
-        }
-        return json.dumps(json_data)
-    
-    # Add JSON-like column to the dataframe
-    df_with_json = df.copy()
-    df_with_json["Sleep_JSON"] = df_with_json.apply(build_sleep_json, axis=1)
+            "totals": {"sl": sl_i, "wans": wans_i, "twt": twt_i, "tib": tib_i, "tst": tst_i, "se": se_i}
+        })
+        for start_time, end_time, sl_i, wans_i, twt_i, tib_i, tst_i, se_i
+        in zip(df["Lights_Off_Clock"], df["Sleep_End_Clock"], sl, wans, twt, tib, tst, se)
+    ]
+
+
+# Save the main dataset and, next to it, the JSON block version (always .xlsx)
+def write_sleepdata(df, output_path):
+    output_path = Path(output_path)
+
+    # # Prepare second file with JSON sleep block + non-sleep diary variables only
+    # (selected directly from df, so the full frame is never copied)
+    diary_vars = ["Participant", "Email", "Day", "SQ", "Rested", "Physical_Activity_Minutes",
+                  "Caffeine", "Medication", "time to calm down and relax"]
+    df_json_only = df[diary_vars].assign(Sleep_JSON=build_sleep_json(df))
     
+    # The JSON block version mimics a website export and is therefore always written as .xlsx
+    jsonblock_path = output_path.parent / f"{output_path.stem}_jsonblock_only.xlsx"
+
     # File 1: original data without JSON-like column
-    df.to_excel(output_path, index=False)
+    save_table(df, output_path)
+    # File 2: JSON sleep block + non-sleep diary variables
+    save_table(df_json_only, jsonblock_path)
+
+
+def generate_time_series_sleepdata(parameter_path, output_path, days=21, n_participants=300, seed=42):
     
-    # # Prepare second file with JSON sleep block + non-sleep diary variables only
-    sleep_vars = ["Out_of_Bed",	"Midpoint", "Lights_Off_Clock",	"Sleep_End_Clock", "Midpoint_Clock",
-                  "Lights_Off", "Sleep_End", "SOL", "WASO", "TWT", "TIB", "TST", "SE"]
-    df_json_only = df_with_json.drop(columns=sleep_vars)
-    cols_order = [col for col in df_json_only.columns if col != "Sleep_JSON"] + ["Sleep_JSON"]
-    df_json_only = df_json_only[cols_order]
+    """
+    Generates synthetic time series sleep diary data based on Natale et al. (2009), with additional habit-related variables.
+    
+    Each mock participant is assigned a unique ID and email, and 21 consecutive days of diary entries are simulated.
+    Core sleep variables (e.g., SOL, WASO, TST, SE) are based on group-level statistics from Natale et al. (2009).
+    Supplementary variables (e.g., Caffeine, Rested, Medication) are added using plausible distributions.
+    
+    Gamma distributions model positively skewed variables (e.g., SOL, WASO), while clock-time 
+    variables are drawn from normal distributions centered around realistic values.
+    
+    In addition to the main numeric dataset, the function also creates an alternate version containing
+    a JSON-formatted sleep block per entry.
     
-    jsonblock_path = output_path.parent / f"{output_path.stem}_jsonblock_only{output_path.suffix}"
-    df_json_only.to_excel(jsonblock_path, index=False)
+    Parameters:
+    - parameter_path (str or Path): .csv or Excel file containing group-level sleep parameters.
+    - output_path (str or Path): Path to save the primary file with numeric and clock-format variables.
+      The format follows the suffix: .parquet, .csv, or .xlsx.
+    - days (int, default=21): Number of simulated days per participant.
+    - n_participants (int, default=300): Number of mock participants to generate.
+    - seed (int or np.random.Generator, default=42): Seed value for reproducibility, or an existing
+      Generator to draw from (e.g. to share one random stream across several calls).
+    
+    Returns:
+    - df (pd.DataFrame): The main DataFrame with numeric and clock-format variables.
+      An additional Excel file (.xlsx, mimicking a website export) is saved alongside the main output, including
+      an extra column ('Sleep_JSON') with sleep details in JSON-like format.
+    """
+
+    # PCG64-based Generator; an existing Generator passed as seed is used as-is
+    rng = np.random.default_rng(seed)
+
+    params = load_sleep_parameters(parameter_path)
+    identifiers = build_identifier_columns(n_participants, days)
+    df = build_sleepdata(params, identifiers, rng)
+    write_sleepdata(df, output_path)
 
     return df
 
+
+def generate_all(param_paths, output_dir, days=21, n_participants=300, seed=42, suffix=".parquet"):
+    
+    """
+    Generates the augmented synthetic sleep diary datasets for several groups (e.g., control and insomnia) in one run.
+    
+    Participant codes, emails, and dates are built once and reused for all groups, and all groups draw from
+    a single random Generator. All sleep and diary variables are drawn separately for each group.
+    
+    Parameters:
+    - param_paths (dict of str -> str or Path): Group name (e.g. "control") mapped to its .csv or Excel parameter file.
+    - output_dir (str or Path): Folder in which the files are saved as
+      'synthetic_sleepdata_timeseries_<group>_augmented<suffix>' (plus the JSON block version as .xlsx).
+    - days (int, default=21): Number of simulated days per participant.
+    - n_participants (int, default=300): Number of mock participants to generate per group.
+    - seed (int or np.random.Generator, default=42): Seed value for reproducibility, or an existing Generator.
+    - suffix (str, default=".parquet"): Output format of the main files: ".parquet", ".csv", or ".xlsx".
+    
+    Returns:
+    - dfs (dict of str -> pd.DataFrame): The main DataFrame per group.
+    """
+
+    rng = np.random.default_rng(seed)
+    output_dir = Path(output_dir)
+
+    identifiers = build_identifier_columns(n_participants, days)
+
+    dfs = {}
+    for group, parameter_path in param_paths.items():
+        params = load_sleep_parameters(parameter_path)
+        dfs[group] = build_sleepdata(params, identifiers, rng)
+        write_sleepdata(dfs[group], output_dir / f"synthetic_sleepdata_timeseries_{group}_augmented{suffix}")
+
+    return dfs
+
 # For standalone execution:
 def main():
-    parameter_path = base_path /"input/natale2009_control_group_sleep_main_parameters.xlsx"
-    # parameter_path = base_path /"input/natale2009_insomnia_group_sleep_main_parameters.xlsx"
-
-    output_path = base_path /"output/synthetic_sleepdata_timeseries_control_augmented.xlsx"
-    # output_path = base_path /"output/synthetic_sleepdata_timeseries_insomnia_augmented.xlsx"
-    generate_time_series_sleepdata(parameter_path, output_path)
+    param_paths = {
+        "control": base_path /"input/natale2009_control_group_sleep_main_parameters.csv",
+        "insomnia": base_path /"input/natale2009_insomnia_group_sleep_main_parameters.csv",
+    }
+    generate_all(param_paths, base_path /"output")
     
     
 
@@ -10,7 +10,8 @@ sleep variables such as SOL, WASO, TST, SE, Lights Off, Sleep End, Out of Bed, T
 Gamma distributions are used for positively skewed variables (e.g., SOL, WASO), while clock-time
 variables follow normal distributions centered around realistic means.
 
-Outputs are saved as Excel (.xlsx) files in both numeric and human-readable clock formats.
+Outputs are saved as Parquet (.parquet) files by default (.csv and .xlsx are also supported),
+in both numeric and human-readable clock formats.
 
 Author: Iris Vantieghem
 Created: July 2025
@@ -22,9 +23,53 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, time, timedelta
 from pathlib import Path
+import importlib.util
 
 base_path = Path(__file__).resolve().parent
 
+# Prefer xlsxwriter for writing .xlsx output (considerably faster than openpyxl); fall back to openpyxl if unavailable
+EXCEL_ENGINE = "xlsxwriter" if importlib.util.find_spec("xlsxwriter") else "openpyxl"
+
+
+# Save a DataFrame in the format given by the file suffix: .parquet, .csv, or .xlsx (default)
+def save_table(df, output_path):
+    suffix = Path(output_path).suffix.lower()
+    if suffix == ".parquet":
+        df.to_parquet(output_path, engine="pyarrow", compression="zstd", index=False)
+    elif suffix == ".csv":
+        df.to_csv(output_path, index=False)
+    else:
+        df.to_excel(output_path, index=False, engine=EXCEL_ENGINE)
+
+
+# Format minutes relative to midnight (negative or beyond 24h allowed) as "HH:MM" clock times
+def minutes_to_clock(values):
+    hours, minutes = np.divmod(np.floor(values).astype(int) % (24 * 60), 60)
+    return [f"{h:02d}:{m:02d}" for h, m in zip(hours.tolist(), minutes.tolist())]
+
+
+# Derive the remaining sleep parameters from the drawn clock times, SOL, WASO, and wait time (all arrays, in minutes)
+def derive_sleep_measures(lights_off_min, sleep_end_min, sol, waso, wait_time):
+    # Getting out of bed happens 'wait_time' minutes after waking up
+    out_of_bed_min = sleep_end_min + wait_time
+
+    # Time in bed
+    tib = out_of_bed_min - lights_off_min
+
+    # TWT
+    twt = sol + waso
+
+    # Total Sleep Time
+    tst = tib - (sol + waso) # alternatively: use tib - twt
+
+    # Sleep efficiency
+    se = np.where(tib > 0, (tst / tib) * 100, np.nan)
+
+    # Midpoint of sleep based on lights_off and time of getting out of bed
+    midpoint = (lights_off_min + out_of_bed_min) / 2 # Alternatively, (lights_off_min + sol) + sleep_end_min
+
+    return out_of_bed_min, tib, twt, tst, se, midpoint
+
 
 def generate_time_series_sleepdata(parameter_path, output_path, days=21, n_participants=100, seed=42):
     
@@ -37,43 +82,47 @@ def generate_time_series_sleepdata(parameter_path, output_path, days=21, n_parti
     'Sleep End' are treated as clock times and include logic for handling values that cross midnight.
 
     Parameters:
-    - parameter_path (str or Path): Path to the Excel file containing the summary statistics.
-    - output_path (str or Path): Path where the generated .xlsx file will be saved.
+    - parameter_path (str or Path): Path to the .csv or Excel file containing the summary statistics.
+    - output_path (str or Path): Path where the generated file will be saved (.parquet, .csv, or .xlsx).
     - days (int, default=21): Number of days to simulate for each participant.
     - n_participants (int, default=100): Number of mock participants to generate.
-    - seed (int, default=42): Random seed for reproducibility.
+    - seed (int or np.random.Generator, default=42): Random seed for reproducibility, or an existing
+      Generator to draw from (e.g. to share one random stream across several calls).
 
     Returns:
     - df (pd.DataFrame): DataFrame containing the synthetic sleep data in numeric and clock format.
     """
-    np.random.seed(seed)
+    # PCG64-based Generator; an existing Generator passed as seed is used as-is
+    rng = np.random.default_rng(seed)
 
-    df_params = pd.read_excel(parameter_path).set_index("Variable")
+    # .csv parameter files are read without the Excel (openpyxl) stack; other files are read as Excel.
+    # 'Mean' mixes clock times and numbers, so it is kept as a generic object column (as read_excel does)
+    if Path(parameter_path).suffix.lower() == ".csv":
+        df_params = pd.read_csv(parameter_path, dtype={"Mean": object}).set_index("Variable")
+    else:
+        df_params = pd.read_excel(parameter_path).set_index("Variable")
 
         
         # Updated time conversion function
     def convert_time_to_minutes(val, allow_negative=False):
-        if isinstance(val, (pd.Timestamp, datetime)):
-            mins = val.hour * 60 + val.minute
-
-        elif isinstance(val, time):
-            mins = val.hour * 60 + val.minute
-
-        elif isinstance(val, timedelta):
-            return val.total_seconds() / 60
+        # Plain numbers are already in minutes: return early
+        if isinstance(val, (int, float)):
+            return val
 
         elif isinstance(val, str):
             t = pd.to_datetime(val).time()
             mins = t.hour * 60 + t.minute
 
-        elif isinstance(val, (int, float)):
-            return val
+        elif isinstance(val, (pd.Timestamp, datetime, time)):
+            mins = val.hour * 60 + val.minute
+
+        elif isinstance(val, timedelta):
+            return val.total_seconds() / 60
         
         else:
             raise TypeError(f"Unexpected type: {type(val)}")
         
         if allow_negative and mins >= 1080: # 18*60 meaning after 6 pm! --> if after 6 pm: interpret this as 'the evening before'
-            print("conversion going on: ", mins - 1440)
             return mins - 1440  # interpretes 23:30 as -30
         return mins
     
@@ -86,86 +135,79 @@ def generate_time_series_sleepdata(parameter_path, output_path, days=21, n_parti
     df_params.loc["Light Off", "SD"] *= 60
     df_params.loc["Sleep End", "SD"] *= 60
 
-    # Retrieve mean and SD for a given variable from the parameter table
-    def get_params(var):
-        return float(df_params.loc[var, "Mean"]), float(df_params.loc[var, "SD"])
-
-    records = []
-
-    for pid in range(1, n_participants + 1):
-        for day in range(1, days + 1):
-            record = {"Code": f"Mock_{pid:03d}", "Day": day}
-            
-            # Generated sleep parameters:          
-            
-            # Lights off (based on mean, SD from Natale et al., 2009)    
-            mu_loff, sd_loff = get_params("Light Off")
-            lights_off_min = np.random.normal(mu_loff, sd_loff)
-            record["Lights_Off"] = lights_off_min
-            
-            # Sleep End (based on mean, SD from Natale et al., 2009) 
-            mu_send, sd_send = get_params("Sleep End")
-            sleep_end_min = np.random.normal(mu_send, sd_send)
-            record["Sleep_End"] = sleep_end_min
-            
-            # Sleep Onset Latency (based on mean, SD from Natale et al., 2009) 
-            mu_sol, sd_sol = get_params("SOL")
-            shape_sol = (mu_sol / sd_sol) ** 2
-            scale_sol = sd_sol ** 2 / mu_sol
-            sol = np.random.gamma(shape_sol, scale_sol)
-            record["SOL"] = sol
-            
-            # Wake After Sleep Onset (based on mean, SD from Natale et al., 2009)
-            mu_waso, sd_waso = get_params("WASO")
-            shape_waso = (mu_waso / sd_waso) ** 2
-            scale_waso = sd_waso ** 2 / mu_waso
-            waso = np.random.gamma(shape_waso, scale_waso)
-            record["WASO"] = waso
-            
-            # Derived sleep parameters:
-            
-            # Time between waking up and getting out of bed
-            wait_time = np.clip(np.random.normal(15, 10), 5, 30)
-            out_of_bed_min = sleep_end_min + wait_time
-            record["Out_of_Bed"] = out_of_bed_min
-            
-            # Time in bed
-            tib = out_of_bed_min - lights_off_min
-            record["TIB"] = tib
-            
-            # TWT
-            twt = sol + waso
-            record["TWT"] = twt
-            
-            # Total Sleep Time
-            tst = tib - (sol + waso) # alternatively: use tib - twt
-            record["TST"] = tst
-            
-            # Sleep efficiency
-            se = (tst / tib) * 100 if tib > 0 else np.nan
-            record["SE"] = se
-            # Midpoint of sleep based on lights_off and time of getting out of bed
-            midpoint = (lights_off_min + out_of_bed_min) / 2 # Alternatively, (lights_off_min + sol) + sleep_end_min
-            record["Midpoint"] = midpoint
-
-            records.append(record)
-
-    df = pd.DataFrame(records)
+    # Mean and SD per variable as a plain dict, so lookups skip pandas label-based indexing
+    params = {var: (float(df_params.loc[var, "Mean"]), float(df_params.loc[var, "SD"])) for var in df_params.index}
+
+    # All entries are drawn in one batch: one row per participant per day
+    n_records = n_participants * days
+    day = np.tile(np.arange(1, days + 1), n_participants)
+
+    # Participant codes are formatted once per participant and repeated for each day
+    codes = [f"Mock_{pid:03d}" for pid in range(1, n_participants + 1)]
+
+    # All normally distributed variables share one standard normal draw; each row is scaled to its own mean and SD
+    z_loff, z_send, z_wait = rng.standard_normal((3, n_records))
+
+    # Generated sleep parameters:
+
+    # Lights off (based on mean, SD from Natale et al., 2009)
+    mu_loff, sd_loff = params["Light Off"]
+    lights_off_min = mu_loff + sd_loff * z_loff
+
+    # Sleep End (based on mean, SD from Natale et al., 2009)
+    mu_send, sd_send = params["Sleep End"]
+    sleep_end_min = mu_send + sd_send * z_send
+
+    # Sleep Onset Latency (based on mean, SD from Natale et al., 2009)
+    mu_sol, sd_sol = params["SOL"]
+    shape_sol = (mu_sol / sd_sol) ** 2
+    scale_sol = sd_sol ** 2 / mu_sol
+    sol = rng.gamma(shape_sol, scale_sol, n_records)
+
+    # Wake After Sleep Onset (based on mean, SD from Natale et al., 2009)
+    mu_waso, sd_waso = params["WASO"]
+    shape_waso = (mu_waso / sd_waso) ** 2
+    scale_waso = sd_waso ** 2 / mu_waso
+    waso = rng.gamma(shape_waso, scale_waso, n_records)
+
+    # Derived sleep parameters:
+
+    # Time between waking up and getting out of bed
+    wait_time = np.clip(15 + 10 * z_wait, 5, 30)
+
+    out_of_bed_min, tib, twt, tst, se, midpoint = derive_sleep_measures(lights_off_min, sleep_end_min, sol, waso, wait_time)
+
+    # Columns are assembled as arrays (no per-row dicts); copy=False lets pandas wrap them without copying.
+    # Sleep variables are stored as float32: minute-level values do not need double precision
+    df = pd.DataFrame({
+        "Code": np.repeat(codes, days),
+        "Day": day,
+        "Lights_Off": lights_off_min.astype(np.float32),
+        "Sleep_End": sleep_end_min.astype(np.float32),
+        "SOL": sol.astype(np.float32),
+        "WASO": waso.astype(np.float32),
+        "Out_of_Bed": out_of_bed_min.astype(np.float32),
+        "TIB": tib.astype(np.float32),
+        "TWT": twt.astype(np.float32),
+        "TST": tst.astype(np.float32),
+        "SE": se.astype(np.float32),
+        "Midpoint": midpoint.astype(np.float32),
+    }, copy=False)
 
     # Add clock-format columns for readability
     for col in ["Lights_Off", "Sleep_End", "Midpoint"]:
-        df[f"{col}_Clock"] = df[col].apply(lambda x: pd.to_datetime(x % (24 * 60), unit='m').strftime("%H:%M"))
+        df[f"{col}_Clock"] = minutes_to_clock(df[col].to_numpy())
 
-    df.to_excel(output_path, index=False)
+    save_table(df, output_path)
     return df
 
 # For standalone execution:
 def main():
-    # parameter_path = base_path /"input/natale2009_control_group_sleep_main_parameters.xlsx"
-    parameter_path = base_path /"input/natale2009_insomnia_group_sleep_main_parameters.xlsx"
+    # parameter_path = base_path /"input/natale2009_control_group_sleep_main_parameters.csv"
+    parameter_path = base_path /"input/natale2009_insomnia_group_sleep_main_parameters.csv"
 
-    # output_path = base_path /"output/synthetic_sleepdata_timeseries_control_gamma_clock.xlsx"
-    output_path = base_path /"output/synthetic_sleepdata_timeseries_insomnia_gamma_clock.xlsx"
+    # output_path = base_path /"output/synthetic_sleepdata_timeseries_control_gamma_clock.parquet"
+    output_path = base_path /"output/synthetic_sleepdata_timeseries_insomnia_gamma_clock.parquet"
     generate_time_series_sleepdata(parameter_path, output_path)
 
 if __name__ == "__main__":